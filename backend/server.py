@@ -1,7 +1,13 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient, InsertOne, ReturnDocument
+from pymongo.write_concern import WriteConcern
+from passlib.context import CryptContext
+from cachetools import TTLCache
+import orjson
+import asyncio
 import os
 import logging
 from pathlib import Path
@@ -13,11 +19,21 @@ from datetime import datetime, timezone
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection (one pool per uvicorn worker process)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncMongoClient(
+    mongo_url,
+    tz_aware=True,
+    maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', '20')),
+    minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', '2')),
+    waitQueueTimeoutMS=2500,
+    serverSelectionTimeoutMS=3000,
+)
 db = client[os.environ['DB_NAME']]
 
+# Password hashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 # Create the main app without a prefix
 app = FastAPI()
 
@@ -30,12 +46,14 @@ class User(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
     username: str
-    password: str
     role: Literal["student", "teacher", "admin"]
     name: str
     email: str
     profile_pic: Optional[str] = None
 
+class UserCreate(User):
+    password: str
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -91,7 +109,7 @@ class StudyMaterial(BaseModel):
     description: str
     file_url: str
     uploaded_by: str
-    uploaded_date: str
+    uploaded_date: datetime
     semester: int
     department: str
 
@@ -127,12 +145,17 @@ class Complaint(BaseModel):
     status: Literal["pending", "resolved"]
     submitted_by: str
     submitted_by_name: str
-    submitted_date: str
+    submitted_date: datetime
     assigned_to: Optional[str] = None
     votes: int = 0
     voted_by: List[str] = []
     response: Optional[str] = None
-    resolved_date: Optional[str] = None
+    resolved_date: Optional[datetime] = None
+
+class ComplaintStat(BaseModel):
+    status: Literal["pending", "resolved"]
+    complaint_type: Literal["public", "private"]
+    count: int
 
 class Schedule(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -163,8 +186,162 @@ class AttendanceWaiver(BaseModel):
     subject_code: str
     reason: str
 
+# ==================== HELPERS ====================
+
+def projection(model: type[BaseModel]) -> dict:
+    """Build a MongoDB projection that fetches only the fields of the given model."""
+    fields = {name: 1 for name in model.model_fields}
+    fields["_id"] = 0
+    return fields
+
+USER_PROJ = projection(User)
+LOGIN_PROJ = {**USER_PROJ, "password_hash": 1}
+STUDENT_PROJ = projection(Student)
+GRADE_PROJ = projection(Grade)
+ATTENDANCE_PROJ = projection(Attendance)
+MATERIAL_PROJ = projection(StudyMaterial)
+LIBRARY_PROJ = projection(LibraryBook)
+EVENT_PROJ = projection(Event)
+COMPLAINT_PROJ = projection(Complaint)
+SCHEDULE_PROJ = projection(Schedule)
+NOTICE_PROJ = projection(Notice)
+ID_ONLY_PROJ = {"_id": 1}
+
+# Compound index the attendance waiver hints explicitly, bypassing the query planner
+ATTENDANCE_SUBJECT_INDEX = [("student_id", 1), ("subject_code", 1)]
+
+# Pipeline update, so total_classes is read server-side
+WAIVE_ATTENDANCE_UPDATE = [
+    {"$set": {"attended_classes": "$total_classes", "percentage": 100.0}}
+]
+
+# Sorting on the (status, complaint_type) index first lets $group read it in order
+COMPLAINT_STATS_PIPELINE = [
+    {"$sort": {"status": 1, "complaint_type": 1}},
+    {"$group": {
+        "_id": {"status": "$status", "complaint_type": "$complaint_type"},
+        "count": {"$sum": 1}
+    }},
+    {"$project": {
+        "_id": 0,
+        "status": "$_id.status",
+        "complaint_type": "$_id.complaint_type",
+        "count": 1
+    }},
+]
+
+# List endpoints page by id: ?limit=N&after=<last id of the previous page>
+MAX_PAGE_SIZE = 1000
+# Documents per cursor batch, so decoding overlaps with the next batch's fetch
+READ_BATCH_SIZE = 100
+
+class Page:
+    """Query parameters shared by the paginated list endpoints."""
+
+    def __init__(
+        self,
+        limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = None,
+    ):
+        self.limit = limit
+        self.after = after
+
+# Reads currently running against MongoDB, keyed by collection, filter and page
+inflight_reads = {}
+
+async def find_shared(
+    collection: str,
+    query: dict,
+    proj: dict,
+    limit: int = MAX_PAGE_SIZE,
+    after: Optional[str] = None,
+) -> list:
+    """Fetch one page of documents ordered by id, sharing the round-trip
+    between concurrent identical reads.
+
+    The query runs in its own task, which every caller awaits through
+    asyncio.shield, so cancelling one request never cancels the read for the
+    others waiting on it.
+    """
+    key = (collection, tuple(sorted(query.items())), limit, after)
+    task = inflight_reads.get(key)
+    if task is None:
+        if after is not None:
+            query = {**query, "id": {"$gt": after}}
+        task = asyncio.create_task(read_page(collection, query, proj, limit))
+        inflight_reads[key] = task
+        task.add_done_callback(lambda done: finish_read(key, done))
+    return await asyncio.shield(task)
+
+async def read_page(collection: str, query: dict, proj: dict, limit: int) -> list:
+    cursor = (
+        db[collection].find(query, proj)
+        .sort("id", 1)
+        .limit(limit)
+        .batch_size(READ_BATCH_SIZE)
+    )
+    return [doc async for doc in cursor]
+
+def finish_read(key: tuple, task: asyncio.Task) -> None:
+    if inflight_reads.get(key) is task:
+        del inflight_reads[key]
+    # Mark a failure as retrieved even if every waiter was cancelled
+    if not task.cancelled():
+        task.exception()
+
+# The library listing is only written by reset-demo-data, so it is cached as
+# encoded JSON pages keyed by (collection, limit, after), so maxsize and ttl
+# bound every page a client can ask for. The cache is per worker process: anything users write
+# and then re-read (events, notices) must not be cached here, since the
+# re-read may land on a worker whose cache the write never cleared.
+listing_cache = TTLCache(maxsize=64, ttl=30)
+
+async def cached_listing(key: str, proj: dict, page: Page) -> Response:
+    """Serve a page of a collection from the listing cache, querying MongoDB on a miss."""
+    cache_key = (key, page.limit, page.after)
+    content = listing_cache.get(cache_key)
+    if content is None:
+        content = orjson.dumps(await find_shared(key, {}, proj, page.limit, page.after))
+        listing_cache[cache_key] = content
+    return Response(content=content, media_type="application/json")
+
+def to_document(model: BaseModel) -> dict:
+    """Copy a validated model's field values into a new dict for MongoDB.
+
+    This is a shallow copy, so list fields (registered_users, voted_by,
+    target_audience) are shared with the model rather than copied. That is
+    fine for documents that are written and discarded, but models with nested
+    models still need model_dump().
+    """
+    return model.__dict__.copy()
+
+# Demo data is reseeded on demand, so its inserts skip waiting for the journal
+DEMO_WRITE_CONCERN = WriteConcern(w=1, j=False)
+
+async def insert_demo_documents(collection: str, docs: list) -> None:
+    """Insert demo documents as one unordered bulk write."""
+    await db[collection].with_options(write_concern=DEMO_WRITE_CONCERN).bulk_write(
+        [InsertOne(doc) for doc in docs], ordered=False
+    )
+
+async def hash_user_password(user: dict) -> dict:
+    """Replace the plaintext password in a user document with its bcrypt hash.
+
+    bcrypt is deliberately slow, so it runs in a worker thread rather than
+    blocking the event loop.
+    """
+    user["password_hash"] = await asyncio.to_thread(pwd_context.hash, user.pop("password"))
+    return user
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    """Check a password against a bcrypt hash without blocking the event loop."""
+    return await asyncio.to_thread(pwd_context.verify, password, password_hash)
+
 # ==================== ROUTES ====================
 
+# List endpoints return a Response directly, so FastAPI skips validating it
+# against response_model; the model only documents the schema.
+
 @api_router.get("/")
 async def root():
     return {"message": "College Campus API"}
@@ -172,30 +349,33 @@ async def root():
 # Authentication
 @api_router.post("/auth/login", response_model=LoginResponse)
 async def login(request: LoginRequest):
-    user = await db.users.find_one(
-        {"username": request.username, "password": request.password},
-        {"_id": 0}
-    )
+    # Usernames may be shared across roles, so check the password against each match
+    users = await db.users.find({"username": request.username}, LOGIN_PROJ).to_list(100)
     
-    if user:
-        return LoginResponse(success=True, user=User(**user))
-    else:
-        return LoginResponse(success=False, message="Invalid credentials")
+    for user in users:
+        password_hash = user.get("password_hash")
+        if password_hash and await verify_password(request.password, password_hash):
+            return LoginResponse(success=True, user=User(**user))
+    
+    return LoginResponse(success=False, message="Invalid credentials")
 
 # Users
-@api_router.get("/users", response_model=List[User])
-async def get_users():
-    users = await db.users.find({}, {"_id": 0}).to_list(1000)
-    return users
+@api_router.get("/users", response_model=List[User], response_class=ORJSONResponse)
+async def get_users(page: Page = Depends()):
+    users = await find_shared("users", {}, USER_PROJ, page.limit, page.after)
+    return ORJSONResponse(users)
 
 @api_router.post("/users", response_model=User)
-async def create_user(user: User):
-    await db.users.insert_one(user.model_dump())
+async def create_user(user: UserCreate):
+    await db.users.insert_one(await hash_user_password(to_document(user)))
     return user
 
 @api_router.put("/users/{user_id}", response_model=User)
-async def update_user(user_id: str, user: User):
-    await db.users.update_one({"id": user_id}, {"$set": user.model_dump()})
+async def update_user(user_id: str, user: UserCreate):
+    await db.users.update_one(
+        {"id": user_id},
+        {"$set": await hash_user_password(to_document(user)), "$unset": {"password": ""}}
+    )
     return user
 
 @api_router.delete("/users/{user_id}")
@@ -204,158 +384,155 @@ async def delete_user(user_id: str):
     return {"message": "User deleted"}
 
 # Students
-@api_router.get("/students", response_model=List[Student])
-async def get_students():
-    students = await db.students.find({}, {"_id": 0}).to_list(1000)
-    return students
+@api_router.get("/students", response_model=List[Student], response_class=ORJSONResponse)
+async def get_students(page: Page = Depends()):
+    students = await find_shared("students", {}, STUDENT_PROJ, page.limit, page.after)
+    return ORJSONResponse(students)
 
 @api_router.get("/students/{student_id}", response_model=Student)
 async def get_student(student_id: str):
-    student = await db.students.find_one({"id": student_id}, {"_id": 0})
+    student = await db.students.find_one({"id": student_id}, STUDENT_PROJ)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
 
 # Grades
-@api_router.get("/grades/{student_id}", response_model=List[Grade])
-async def get_grades(student_id: str):
-    grades = await db.grades.find({"student_id": student_id}, {"_id": 0}).to_list(1000)
-    return grades
+@api_router.get("/grades/{student_id}", response_model=List[Grade], response_class=ORJSONResponse)
+async def get_grades(student_id: str, page: Page = Depends()):
+    grades = await find_shared("grades", {"student_id": student_id}, GRADE_PROJ, page.limit, page.after)
+    return ORJSONResponse(grades)
 
-@api_router.get("/grades", response_model=List[Grade])
-async def get_all_grades():
-    grades = await db.grades.find({}, {"_id": 0}).to_list(1000)
-    return grades
+@api_router.get("/grades", response_model=List[Grade], response_class=ORJSONResponse)
+async def get_all_grades(page: Page = Depends()):
+    grades = await find_shared("grades", {}, GRADE_PROJ, page.limit, page.after)
+    return ORJSONResponse(grades)
 
 @api_router.post("/grades", response_model=Grade)
 async def create_grade(grade: Grade):
-    await db.grades.insert_one(grade.model_dump())
+    await db.grades.insert_one(to_document(grade))
     return grade
 
 @api_router.put("/grades/{grade_id}", response_model=Grade)
 async def update_grade(grade_id: str, grade: Grade):
-    await db.grades.update_one({"id": grade_id}, {"$set": grade.model_dump()})
+    await db.grades.update_one({"id": grade_id}, {"$set": to_document(grade)})
     return grade
 
 # Attendance
-@api_router.get("/attendance/{student_id}", response_model=List[Attendance])
-async def get_attendance(student_id: str):
-    attendance = await db.attendance.find({"student_id": student_id}, {"_id": 0}).to_list(1000)
-    return attendance
+@api_router.get("/attendance/{student_id}", response_model=List[Attendance], response_class=ORJSONResponse)
+async def get_attendance(student_id: str, page: Page = Depends()):
+    attendance = await find_shared("attendance", {"student_id": student_id}, ATTENDANCE_PROJ, page.limit, page.after)
+    return ORJSONResponse(attendance)
 
-@api_router.get("/attendance", response_model=List[Attendance])
-async def get_all_attendance():
-    attendance = await db.attendance.find({}, {"_id": 0}).to_list(1000)
-    return attendance
+@api_router.get("/attendance", response_model=List[Attendance], response_class=ORJSONResponse)
+async def get_all_attendance(page: Page = Depends()):
+    attendance = await find_shared("attendance", {}, ATTENDANCE_PROJ, page.limit, page.after)
+    return ORJSONResponse(attendance)
 
 @api_router.post("/attendance/waive", response_model=dict)
 async def waive_attendance(waiver: AttendanceWaiver):
-    # Update attendance for specific student and subject
-    attendance_record = await db.attendance.find_one(
-        {"student_id": waiver.student_id, "subject_code": waiver.subject_code}
+    # Set attendance to 100% in one round-trip
+    attendance_record = await db.attendance.find_one_and_update(
+        {"student_id": waiver.student_id, "subject_code": waiver.subject_code},
+        WAIVE_ATTENDANCE_UPDATE,
+        projection=ID_ONLY_PROJ,
+        hint=ATTENDANCE_SUBJECT_INDEX,
+        return_document=ReturnDocument.AFTER,
     )
     
     if attendance_record:
-        # Set attendance to 100%
-        await db.attendance.update_one(
-            {"student_id": waiver.student_id, "subject_code": waiver.subject_code},
-            {"$set": {"attended_classes": attendance_record["total_classes"], "percentage": 100.0}}
-        )
         return {"success": True, "message": "Attendance waived"}
     else:
         raise HTTPException(status_code=404, detail="Attendance record not found")
 
 # Study Materials
-@api_router.get("/materials", response_model=List[StudyMaterial])
-async def get_materials():
-    materials = await db.materials.find({}, {"_id": 0}).to_list(1000)
-    return materials
+@api_router.get("/materials", response_model=List[StudyMaterial], response_class=ORJSONResponse)
+async def get_materials(page: Page = Depends()):
+    materials = await find_shared("materials", {}, MATERIAL_PROJ, page.limit, page.after)
+    return ORJSONResponse(materials)
 
 @api_router.post("/materials", response_model=StudyMaterial)
 async def create_material(material: StudyMaterial):
-    await db.materials.insert_one(material.model_dump())
+    await db.materials.insert_one(to_document(material))
     return material
 
 # Library
-@api_router.get("/library", response_model=List[LibraryBook])
-async def get_library_books():
-    books = await db.library.find({}, {"_id": 0}).to_list(1000)
-    return books
+@api_router.get("/library", response_model=List[LibraryBook], response_class=ORJSONResponse)
+async def get_library_books(page: Page = Depends()):
+    return await cached_listing("library", LIBRARY_PROJ, page)
 
 # Events
-@api_router.get("/events", response_model=List[Event])
-async def get_events():
-    events = await db.events.find({}, {"_id": 0}).to_list(1000)
-    return events
+@api_router.get("/events", response_model=List[Event], response_class=ORJSONResponse)
+async def get_events(page: Page = Depends()):
+    events = await find_shared("events", {}, EVENT_PROJ, page.limit, page.after)
+    return ORJSONResponse(events)
 
 @api_router.post("/events", response_model=Event)
 async def create_event(event: Event):
-    await db.events.insert_one(event.model_dump())
+    await db.events.insert_one(to_document(event))
     return event
 
 @api_router.put("/events/{event_id}", response_model=Event)
 async def update_event(event_id: str, event: Event):
-    await db.events.update_one({"id": event_id}, {"$set": event.model_dump()})
+    await db.events.update_one({"id": event_id}, {"$set": to_document(event)})
     return event
 
 @api_router.post("/events/{event_id}/register")
 async def register_for_event(event_id: str, user_id: dict):
     uid = user_id.get("user_id")
-    event = await db.events.find_one({"id": event_id})
+    result = await db.events.update_one(
+        {"id": event_id},
+        {"$addToSet": {"registered_users": uid}}
+    )
     
-    if not event:
+    if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    if uid not in event.get("registered_users", []):
-        await db.events.update_one(
-            {"id": event_id},
-            {"$push": {"registered_users": uid}}
-        )
-    
     return {"success": True, "message": "Registered for event"}
 
 # Complaints
-@api_router.get("/complaints", response_model=List[Complaint])
-async def get_complaints():
-    complaints = await db.complaints.find({}, {"_id": 0}).to_list(1000)
-    return complaints
+@api_router.get("/complaints", response_model=List[Complaint], response_class=ORJSONResponse)
+async def get_complaints(page: Page = Depends()):
+    complaints = await find_shared("complaints", {}, COMPLAINT_PROJ, page.limit, page.after)
+    return ORJSONResponse(complaints)
+
+@api_router.get("/complaints/stats", response_model=List[ComplaintStat])
+async def get_complaint_stats():
+    cursor = await db.complaints.aggregate(COMPLAINT_STATS_PIPELINE)
+    return await cursor.to_list(None)
 
 @api_router.get("/complaints/{complaint_id}", response_model=Complaint)
 async def get_complaint(complaint_id: str):
-    complaint = await db.complaints.find_one({"id": complaint_id}, {"_id": 0})
+    complaint = await db.complaints.find_one({"id": complaint_id}, COMPLAINT_PROJ)
     if not complaint:
         raise HTTPException(status_code=404, detail="Complaint not found")
     return complaint
 
 @api_router.post("/complaints", response_model=Complaint)
 async def create_complaint(complaint: Complaint):
-    await db.complaints.insert_one(complaint.model_dump())
+    await db.complaints.insert_one(to_document(complaint))
     return complaint
 
 @api_router.post("/complaints/{complaint_id}/vote")
 async def vote_complaint(complaint_id: str, user_id: dict):
     uid = user_id.get("user_id")
-    complaint = await db.complaints.find_one({"id": complaint_id})
-    
-    if not complaint:
-        raise HTTPException(status_code=404, detail="Complaint not found")
     
-    voted_by = complaint.get("voted_by", [])
+    # Add vote; the filter only matches if the user hasn't voted yet
+    result = await db.complaints.update_one(
+        {"id": complaint_id, "voted_by": {"$ne": uid}},
+        {"$push": {"voted_by": uid}, "$inc": {"votes": 1}}
+    )
+    if result.modified_count:
+        return {"success": True, "message": "Vote added", "action": "added"}
     
-    if uid in voted_by:
-        # Remove vote
-        await db.complaints.update_one(
-            {"id": complaint_id},
-            {"$pull": {"voted_by": uid}, "$inc": {"votes": -1}}
-        )
+    # Remove vote
+    result = await db.complaints.update_one(
+        {"id": complaint_id, "voted_by": uid},
+        {"$pull": {"voted_by": uid}, "$inc": {"votes": -1}}
+    )
+    if result.modified_count:
         return {"success": True, "message": "Vote removed", "action": "removed"}
-    else:
-        # Add vote
-        await db.complaints.update_one(
-            {"id": complaint_id},
-            {"$push": {"voted_by": uid}, "$inc": {"votes": 1}}
-        )
-        return {"success": True, "message": "Vote added", "action": "added"}
+    
+    raise HTTPException(status_code=404, detail="Complaint not found")
 
 @api_router.put("/complaints/{complaint_id}/resolve", response_model=Complaint)
 async def resolve_complaint(complaint_id: str, response_data: dict):
@@ -364,43 +541,43 @@ async def resolve_complaint(complaint_id: str, response_data: dict):
         {"$set": {
             "status": "resolved",
             "response": response_data.get("response"),
-            "resolved_date": datetime.now(timezone.utc).isoformat()
+            "resolved_date": datetime.now(timezone.utc)
         }}
     )
     
-    complaint = await db.complaints.find_one({"id": complaint_id}, {"_id": 0})
+    complaint = await db.complaints.find_one({"id": complaint_id}, COMPLAINT_PROJ)
     return complaint
 
 # Schedules
-@api_router.get("/schedules", response_model=List[Schedule])
-async def get_schedules():
-    schedules = await db.schedules.find({}, {"_id": 0}).to_list(1000)
-    return schedules
+@api_router.get("/schedules", response_model=List[Schedule], response_class=ORJSONResponse)
+async def get_schedules(page: Page = Depends()):
+    schedules = await find_shared("schedules", {}, SCHEDULE_PROJ, page.limit, page.after)
+    return ORJSONResponse(schedules)
 
-@api_router.get("/schedules/teacher/{teacher_id}", response_model=List[Schedule])
-async def get_teacher_schedules(teacher_id: str):
-    schedules = await db.schedules.find({"teacher_id": teacher_id}, {"_id": 0}).to_list(1000)
-    return schedules
+@api_router.get("/schedules/teacher/{teacher_id}", response_model=List[Schedule], response_class=ORJSONResponse)
+async def get_teacher_schedules(teacher_id: str, page: Page = Depends()):
+    schedules = await find_shared("schedules", {"teacher_id": teacher_id}, SCHEDULE_PROJ, page.limit, page.after)
+    return ORJSONResponse(schedules)
 
 @api_router.post("/schedules", response_model=Schedule)
 async def create_schedule(schedule: Schedule):
-    await db.schedules.insert_one(schedule.model_dump())
+    await db.schedules.insert_one(to_document(schedule))
     return schedule
 
 @api_router.put("/schedules/{schedule_id}", response_model=Schedule)
 async def update_schedule(schedule_id: str, schedule: Schedule):
-    await db.schedules.update_one({"id": schedule_id}, {"$set": schedule.model_dump()})
+    await db.schedules.update_one({"id": schedule_id}, {"$set": to_document(schedule)})
     return schedule
 
 # Notices
-@api_router.get("/notices", response_model=List[Notice])
-async def get_notices():
-    notices = await db.notices.find({}, {"_id": 0}).to_list(1000)
-    return notices
+@api_router.get("/notices", response_model=List[Notice], response_class=ORJSONResponse)
+async def get_notices(page: Page = Depends()):
+    notices = await find_shared("notices", {}, NOTICE_PROJ, page.limit, page.after)
+    return ORJSONResponse(notices)
 
 @api_router.post("/notices", response_model=Notice)
 async def create_notice(notice: Notice):
-    await db.notices.insert_one(notice.model_dump())
+    await db.notices.insert_one(to_document(notice))
     return notice
 
 @api_router.delete("/notices/{notice_id}")
@@ -412,18 +589,24 @@ async def delete_notice(notice_id: str):
 @api_router.post("/reset-demo-data")
 async def reset_demo_data():
     # Clear all collections
-    await db.users.delete_many({})
-    await db.students.delete_many({})
-    await db.grades.delete_many({})
-    await db.attendance.delete_many({})
-    await db.materials.delete_many({})
-    await db.library.delete_many({})
-    await db.events.delete_many({})
-    await db.complaints.delete_many({})
-    await db.schedules.delete_many({})
-    await db.notices.delete_many({})
+    await asyncio.gather(
+        db.users.drop(),
+        db.students.drop(),
+        db.grades.drop(),
+        db.attendance.drop(),
+        db.materials.drop(),
+        db.library.drop(),
+        db.events.drop(),
+        db.complaints.drop(),
+        db.schedules.drop(),
+        db.notices.drop(),
+    )
     
-    # Insert demo users
+    # Dropping the collections also dropped their indexes; rebuild them before
+    # reseeding so hinted queries never run against a missing index
+    await create_indexes()
+    
+    # Demo users
     demo_users = [
         # Students
         {"id": "S123", "username": "ai", "password": "alicepw", "role": "student", "name": "Alice James", "email": "alice@college.edu", "profile_pic": "https://api.dicebear.com/7.x/avataaars/svg?seed=Alice"},
@@ -437,9 +620,8 @@ async def reset_demo_data():
         # Admin
         {"id": "A001", "username": "ai", "password": "srinipw", "role": "admin", "name": "V. Srinivasan", "email": "admin@college.edu", "profile_pic": "https://api.dicebear.com/7.x/avataaars/svg?seed=Srini"},
     ]
-    await db.users.insert_many(demo_users)
     
-    # Insert demo students
+    # Demo students
     demo_students = [
         {"id": "S123", "name": "Alice James", "department": "Computer Science", "year": 3, "semester": 5, "email": "alice@college.edu", "phone": "+91 9876543210", "profile_pic": "https://api.dicebear.com/7.x/avataaars/svg?seed=Alice"},
         {"id": "S124", "name": "Bob Wilson", "department": "Computer Science", "year": 3, "semester": 5, "email": "bob@college.edu", "phone": "+91 9876543211", "profile_pic": "https://api.dicebear.com/7.x/avataaars/svg?seed=Bob"},
@@ -447,9 +629,8 @@ async def reset_demo_data():
         {"id": "S126", "name": "David Chen", "department": "Mechanical", "year": 4, "semester": 7, "email": "david@college.edu", "phone": "+91 9876543213", "profile_pic": "https://api.dicebear.com/7.x/avataaars/svg?seed=David"},
         {"id": "S127", "name": "Emma Thompson", "department": "Computer Science", "year": 3, "semester": 5, "email": "emma@college.edu", "phone": "+91 9876543214", "profile_pic": "https://api.dicebear.com/7.x/avataaars/svg?seed=Emma"},
     ]
-    await db.students.insert_many(demo_students)
     
-    # Insert demo grades (Anna University format)
+    # Demo grades (Anna University format)
     demo_grades = [
         {"id": "G1", "student_id": "S123", "student_name": "Alice James", "subject": "Data Structures", "subject_code": "CS301", "part_a_marks": 8, "part_b_marks": 35, "total_marks": 43, "grade": "A", "semester": 5, "year": 3},
         {"id": "G2", "student_id": "S123", "student_name": "Alice James", "subject": "Database Management", "subject_code": "CS302", "part_a_marks": 9, "part_b_marks": 38, "total_marks": 47, "grade": "A+", "semester": 5, "year": 3},
@@ -457,35 +638,31 @@ async def reset_demo_data():
         {"id": "G4", "student_id": "S124", "student_name": "Bob Wilson", "subject": "Data Structures", "subject_code": "CS301", "part_a_marks": 6, "part_b_marks": 28, "total_marks": 34, "grade": "B", "semester": 5, "year": 3},
         {"id": "G5", "student_id": "S125", "student_name": "Carol Martinez", "subject": "Digital Electronics", "subject_code": "EC201", "part_a_marks": 9, "part_b_marks": 36, "total_marks": 45, "grade": "A", "semester": 4, "year": 2},
     ]
-    await db.grades.insert_many(demo_grades)
     
-    # Insert demo attendance
+    # Demo attendance
     demo_attendance = [
         {"id": "AT1", "student_id": "S123", "student_name": "Alice James", "subject": "Data Structures", "subject_code": "CS301", "total_classes": 45, "attended_classes": 42, "percentage": 93.33, "semester": 5},
         {"id": "AT2", "student_id": "S123", "student_name": "Alice James", "subject": "Database Management", "subject_code": "CS302", "total_classes": 40, "attended_classes": 38, "percentage": 95.0, "semester": 5},
         {"id": "AT3", "student_id": "S123", "student_name": "Alice James", "subject": "Operating Systems", "subject_code": "CS303", "total_classes": 42, "attended_classes": 35, "percentage": 83.33, "semester": 5},
         {"id": "AT4", "student_id": "S124", "student_name": "Bob Wilson", "subject": "Data Structures", "subject_code": "CS301", "total_classes": 45, "attended_classes": 30, "percentage": 66.67, "semester": 5},
     ]
-    await db.attendance.insert_many(demo_attendance)
     
-    # Insert demo study materials
+    # Demo study materials
     demo_materials = [
-        {"id": "M1", "title": "Data Structures - Lecture Notes", "subject": "Data Structures", "subject_code": "CS301", "description": "Complete lecture notes covering trees, graphs, and sorting algorithms", "file_url": "#", "uploaded_by": "Prof. V. Kumar", "uploaded_date": "2025-01-15", "semester": 5, "department": "Computer Science"},
-        {"id": "M2", "title": "DBMS Tutorial - SQL Queries", "subject": "Database Management", "subject_code": "CS302", "description": "Practice SQL queries and normalization exercises", "file_url": "#", "uploaded_by": "Prof. V. Kumar", "uploaded_date": "2025-01-18", "semester": 5, "department": "Computer Science"},
-        {"id": "M3", "title": "OS Concepts - Process Scheduling", "subject": "Operating Systems", "subject_code": "CS303", "description": "Detailed notes on CPU scheduling algorithms", "file_url": "#", "uploaded_by": "Dr. S. Rajamanickam", "uploaded_date": "2025-01-20", "semester": 5, "department": "Computer Science"},
+        {"id": "M1", "title": "Data Structures - Lecture Notes", "subject": "Data Structures", "subject_code": "CS301", "description": "Complete lecture notes covering trees, graphs, and sorting algorithms", "file_url": "#", "uploaded_by": "Prof. V. Kumar", "uploaded_date": datetime(2025, 1, 15, tzinfo=timezone.utc), "semester": 5, "department": "Computer Science"},
+        {"id": "M2", "title": "DBMS Tutorial - SQL Queries", "subject": "Database Management", "subject_code": "CS302", "description": "Practice SQL queries and normalization exercises", "file_url": "#", "uploaded_by": "Prof. V. Kumar", "uploaded_date": datetime(2025, 1, 18, tzinfo=timezone.utc), "semester": 5, "department": "Computer Science"},
+        {"id": "M3", "title": "OS Concepts - Process Scheduling", "subject": "Operating Systems", "subject_code": "CS303", "description": "Detailed notes on CPU scheduling algorithms", "file_url": "#", "uploaded_by": "Dr. S. Rajamanickam", "uploaded_date": datetime(2025, 1, 20, tzinfo=timezone.utc), "semester": 5, "department": "Computer Science"},
     ]
-    await db.materials.insert_many(demo_materials)
     
-    # Insert demo library books
+    # Demo library books
     demo_library = [
         {"id": "L1", "title": "Introduction to Algorithms", "author": "Cormen, Leiserson, Rivest, Stein", "isbn": "978-0262033848", "category": "Computer Science", "available": True, "total_copies": 5, "available_copies": 3},
         {"id": "L2", "title": "Database System Concepts", "author": "Silberschatz, Korth, Sudarshan", "isbn": "978-0073523323", "category": "Computer Science", "available": True, "total_copies": 4, "available_copies": 2},
         {"id": "L3", "title": "Operating System Concepts", "author": "Silberschatz, Galvin, Gagne", "isbn": "978-1118063330", "category": "Computer Science", "available": True, "total_copies": 6, "available_copies": 4},
         {"id": "L4", "title": "Digital Design", "author": "Morris Mano", "isbn": "978-0134549897", "category": "Electronics", "available": False, "total_copies": 3, "available_copies": 0},
     ]
-    await db.library.insert_many(demo_library)
     
-    # Insert demo events
+    # Demo events
     demo_events = [
         {"id": "E1", "title": "Tech Symposium 2025", "description": "Annual technical symposium with paper presentations and workshops", "date": "2025-03-15", "time": "09:00 AM", "location": "Main Auditorium", "event_type": "academic", "registration_required": True, "registered_users": ["S123", "S124"]},
         {"id": "E2", "title": "Cultural Fest - Vibrance 2025", "description": "Three-day cultural festival with music, dance, and drama competitions", "date": "2025-04-10", "time": "10:00 AM", "location": "Open Air Theatre", "event_type": "cultural", "registration_required": True, "registered_users": []},
@@ -493,34 +670,46 @@ async def reset_demo_data():
         {"id": "E4", "title": "Pongal Holiday", "description": "Tamil harvest festival", "date": "2025-01-15", "time": "All Day", "location": "Campus Closed", "event_type": "holiday", "registration_required": False, "registered_users": []},
         {"id": "E5", "title": "Independence Day", "description": "National holiday", "date": "2025-08-15", "time": "All Day", "location": "Campus Closed", "event_type": "holiday", "registration_required": False, "registered_users": []},
     ]
-    await db.events.insert_many(demo_events)
     
-    # Insert demo complaints
+    # Demo complaints
     demo_complaints = [
-        {"id": "C1", "title": "WiFi connectivity issues in hostel", "description": "Frequent disconnections and slow internet speed in hostel blocks A and B", "complaint_type": "public", "status": "pending", "submitted_by": "S123", "submitted_by_name": "Alice James", "submitted_date": "2025-01-20", "votes": 12, "voted_by": ["S123", "S124", "S125"]},
-        {"id": "C2", "title": "Library AC not working", "description": "Air conditioning in the library has been non-functional for 2 weeks", "complaint_type": "public", "status": "pending", "submitted_by": "S124", "submitted_by_name": "Bob Wilson", "submitted_date": "2025-01-18", "votes": 8, "voted_by": ["S124", "S126"]},
-        {"id": "C3", "title": "Cafeteria food quality", "description": "Need improvement in food quality and variety in the main cafeteria", "complaint_type": "public", "status": "resolved", "submitted_by": "S125", "submitted_by_name": "Carol Martinez", "submitted_date": "2025-01-10", "votes": 25, "voted_by": ["S123", "S124", "S125", "S126", "S127"], "response": "We have hired a new catering service and updated the menu. Please provide feedback.", "resolved_date": "2025-01-25"},
-        {"id": "C4", "title": "Grade discrepancy in CS302", "description": "My internal marks don't match what was announced. Need clarification.", "complaint_type": "private", "status": "pending", "submitted_by": "S124", "submitted_by_name": "Bob Wilson", "submitted_date": "2025-01-22", "votes": 0, "voted_by": []},
-        {"id": "C5", "title": "Attendance record error", "description": "Attendance shows 60% but I have submitted medical certificates for all absences", "complaint_type": "private", "status": "resolved", "submitted_by": "S126", "submitted_by_name": "David Chen", "submitted_date": "2025-01-15", "votes": 0, "voted_by": [], "response": "Medical certificates verified. Attendance updated to 85%.", "resolved_date": "2025-01-23"},
+        {"id": "C1", "title": "WiFi connectivity issues in hostel", "description": "Frequent disconnections and slow internet speed in hostel blocks A and B", "complaint_type": "public", "status": "pending", "submitted_by": "S123", "submitted_by_name": "Alice James", "submitted_date": datetime(2025, 1, 20, tzinfo=timezone.utc), "votes": 12, "voted_by": ["S123", "S124", "S125"]},
+        {"id": "C2", "title": "Library AC not working", "description": "Air conditioning in the library has been non-functional for 2 weeks", "complaint_type": "public", "status": "pending", "submitted_by": "S124", "submitted_by_name": "Bob Wilson", "submitted_date": datetime(2025, 1, 18, tzinfo=timezone.utc), "votes": 8, "voted_by": ["S124", "S126"]},
+        {"id": "C3", "title": "Cafeteria food quality", "description": "Need improvement in food quality and variety in the main cafeteria", "complaint_type": "public", "status": "resolved", "submitted_by": "S125", "submitted_by_name": "Carol Martinez", "submitted_date": datetime(2025, 1, 10, tzinfo=timezone.utc), "votes": 25, "voted_by": ["S123", "S124", "S125", "S126", "S127"], "response": "We have hired a new catering service and updated the menu. Please provide feedback.", "resolved_date": datetime(2025, 1, 25, tzinfo=timezone.utc)},
+        {"id": "C4", "title": "Grade discrepancy in CS302", "description": "My internal marks don't match what was announced. Need clarification.", "complaint_type": "private", "status": "pending", "submitted_by": "S124", "submitted_by_name": "Bob Wilson", "submitted_date": datetime(2025, 1, 22, tzinfo=timezone.utc), "votes": 0, "voted_by": []},
+        {"id": "C5", "title": "Attendance record error", "description": "Attendance shows 60% but I have submitted medical certificates for all absences", "complaint_type": "private", "status": "resolved", "submitted_by": "S126", "submitted_by_name": "David Chen", "submitted_date": datetime(2025, 1, 15, tzinfo=timezone.utc), "votes": 0, "voted_by": [], "response": "Medical certificates verified. Attendance updated to 85%.", "resolved_date": datetime(2025, 1, 23, tzinfo=timezone.utc)},
     ]
-    await db.complaints.insert_many(demo_complaints)
     
-    # Insert demo schedules
+    # Demo schedules
     demo_schedules = [
         {"id": "SCH1", "teacher_id": "T202", "teacher_name": "Prof. V. Kumar", "subject": "Data Structures", "subject_code": "CS301", "day": "Monday", "time_slot": "09:00 AM - 10:00 AM", "room": "CS Lab 1", "department": "Computer Science", "year": 3, "semester": 5},
         {"id": "SCH2", "teacher_id": "T202", "teacher_name": "Prof. V. Kumar", "subject": "Database Management", "subject_code": "CS302", "day": "Tuesday", "time_slot": "10:00 AM - 11:00 AM", "room": "Room 301", "department": "Computer Science", "year": 3, "semester": 5},
         {"id": "SCH3", "teacher_id": "T202", "teacher_name": "Prof. V. Kumar", "subject": "Data Structures", "subject_code": "CS301", "day": "Wednesday", "time_slot": "02:00 PM - 03:00 PM", "room": "CS Lab 1", "department": "Computer Science", "year": 3, "semester": 5},
         {"id": "SCH4", "teacher_id": "T203", "teacher_name": "Dr. S. Rajamanickam", "subject": "Operating Systems", "subject_code": "CS303", "day": "Thursday", "time_slot": "11:00 AM - 12:00 PM", "room": "Room 302", "department": "Computer Science", "year": 3, "semester": 5},
     ]
-    await db.schedules.insert_many(demo_schedules)
     
-    # Insert demo notices
+    # Demo notices
     demo_notices = [
         {"id": "N1", "title": "Semester Exam Schedule Released", "content": "The semester 5 examination schedule has been released. Check the academic calendar for details.", "posted_by": "Admin Office", "posted_date": "2025-01-20", "priority": "high", "target_audience": ["student", "teacher"]},
         {"id": "N2", "title": "Library Timings Extended", "content": "Library will be open till 10 PM during exam season (Feb 1 - Feb 28)", "posted_by": "Library", "posted_date": "2025-01-22", "priority": "medium", "target_audience": ["student"]},
         {"id": "N3", "title": "Faculty Meeting - Feb 5", "content": "All faculty members are requested to attend the meeting at 3 PM in Conference Hall", "posted_by": "Principal Office", "posted_date": "2025-01-25", "priority": "high", "target_audience": ["teacher"]},
     ]
-    await db.notices.insert_many(demo_notices)
+    demo_users = await asyncio.gather(*(hash_user_password(u) for u in demo_users))
+    
+    # Insert all demo collections concurrently
+    await asyncio.gather(
+        insert_demo_documents("users", demo_users),
+        insert_demo_documents("students", demo_students),
+        insert_demo_documents("grades", demo_grades),
+        insert_demo_documents("attendance", demo_attendance),
+        insert_demo_documents("materials", demo_materials),
+        insert_demo_documents("library", demo_library),
+        insert_demo_documents("events", demo_events),
+        insert_demo_documents("complaints", demo_complaints),
+        insert_demo_documents("schedules", demo_schedules),
+        insert_demo_documents("notices", demo_notices),
+    )
+    listing_cache.clear()
     
     return {"success": True, "message": "Demo data reset successfully"}
 
@@ -542,6 +731,83 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def connect_db_client():
+    # Open the connection pool now rather than on the first request
+    await client.admin.command("ping")
+
+@app.on_event("startup")
+async def create_indexes():
+    # Index every field the routes filter on so lookups don't scan collections
+    await db.users.create_index("username", background=True)
+    await db.users.create_index("id", background=True)
+    await db.students.create_index("id", background=True)
+    await db.grades.create_index("id", background=True)
+    await db.grades.create_index([("student_id", 1), ("id", 1)], background=True)
+    await db.attendance.create_index(ATTENDANCE_SUBJECT_INDEX, unique=True, background=True)
+    await db.attendance.create_index([("student_id", 1), ("id", 1)], background=True)
+    await db.materials.create_index("id", background=True)
+    await db.library.create_index("id", background=True)
+    await db.events.create_index("id", background=True)
+    await db.complaints.create_index("id", background=True)
+    await db.complaints.create_index([("status", 1), ("complaint_type", 1)], background=True)
+    await db.complaints.create_index("submitted_date", background=True)
+    await db.schedules.create_index("id", background=True)
+    await db.schedules.create_index([("teacher_id", 1), ("id", 1)], background=True)
+    await db.notices.create_index("id", background=True)
+
+# Date fields that used to be stored as ISO strings
+DATE_FIELDS = [
+    ("complaints", "submitted_date"),
+    ("complaints", "resolved_date"),
+    ("materials", "uploaded_date"),
+]
+
+@app.on_event("startup")
+async def migrate_string_dates():
+    # Convert legacy ISO string dates to BSON dates so range queries and sorts
+    # see every document; already-converted values no longer match $type
+    for collection, field in DATE_FIELDS:
+        result = await db[collection].update_many(
+            {field: {"$type": "string"}},
+            [{"$set": {field: {"$dateFromString": {
+                "dateString": f"${field}",
+                "timezone": "UTC",
+                "onError": f"${field}"
+            }}}}]
+        )
+        if result.modified_count:
+            logger.info("Converted %d %s.%s values to dates", result.modified_count, collection, field)
+
+@app.on_event("startup")
+async def migrate_plaintext_passwords():
+    # Users stored before passwords were hashed still carry a plaintext
+    # password; hash it in place so those accounts can keep logging in
+    legacy_users = db.users.find(
+        {"password": {"$exists": True}, "password_hash": {"$exists": False}},
+        {"_id": 1, "password": 1}
+    )
+    async for user in legacy_users:
+        migrated = await hash_user_password({"password": user["password"]})
+        # Match the old password too, in case another worker migrated it first
+        await db.users.update_one(
+            {"_id": user["_id"], "password": user["password"]},
+            {"$set": migrated, "$unset": {"password": ""}}
+        )
+        logger.info("Hashed plaintext password for user %s", user["_id"])
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await client.close()
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "server:app",
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=int(os.environ.get('PORT', '8001')),
+        workers=int(os.environ.get('WEB_CONCURRENCY', 2 * (os.cpu_count() or 1) + 1)),
+        loop="uvloop",
+        http="httptools",
+    )
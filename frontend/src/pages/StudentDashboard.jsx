@@ -99,7 +99,7 @@ const StudentDashboard = ({ user, onLogout }) => {
         status: "pending",
         submitted_by: user.id,
         submitted_by_name: user.name,
-        submitted_date: new Date().toISOString().split('T')[0],
+        submitted_date: new Date().toISOString(),
         votes: 0,
         voted_by: [],
       };
@@ -343,7 +343,7 @@ const StudentDashboard = ({ user, onLogout }) => {
                           <p className="text-sm text-gray-500 mt-1">{material.subject} ({material.subject_code})</p>
                           <p className="text-sm text-gray-600 mt-2">{material.description}</p>
                           <p className="text-xs text-gray-400 mt-2">
-                            Uploaded by {material.uploaded_by} on {material.uploaded_date}
+                            Uploaded by {material.uploaded_by} on {material.uploaded_date.split('T')[0]}
                           </p>
                         </div>
                         <Button data-testid={`download-material-${material.id}`} size="sm" variant="outline">
@@ -467,7 +467,7 @@ const StudentDashboard = ({ user, onLogout }) => {
                             </div>
                             <p className="text-sm text-gray-600 mb-2">{complaint.description}</p>
                             <p className="text-xs text-gray-400">
-                              Submitted by {complaint.submitted_by_name} on {complaint.submitted_date}
+                              Submitted by {complaint.submitted_by_name} on {complaint.submitted_date.split('T')[0]}
                             </p>
                             {complaint.response && (
                               <div className="mt-3 p-3 bg-green-50 border border-green-200 rounded">
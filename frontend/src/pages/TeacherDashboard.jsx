@@ -310,7 +310,7 @@ const TeacherDashboard = ({ user, onLogout }) => {
                             </div>
                             <p className="text-sm text-gray-600 mb-2">{complaint.description}</p>
                             <p className="text-xs text-gray-400">
-                              Submitted by {complaint.submitted_by_name} on {complaint.submitted_date}
+                              Submitted by {complaint.submitted_by_name} on {complaint.submitted_date.split('T')[0]}
                             </p>
                             {complaint.complaint_type === "public" && (
                               <p className="text-xs text-gray-500 mt-1">{complaint.votes} votes</p>
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    def batch_size(self, *args):
+        return self
+
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self):
+        await self.collection.release.wait()
+        if self.collection.error:
+            raise self.collection.error
+        for doc in self.collection.docs:
+            yield doc
+
+
+class FakeCollection:
+    def __init__(self, docs=(), error=None):
+        self.docs = list(docs)
+        self.error = error
+        self.find_calls = 0
+        self.release = asyncio.Event()
+
+    def find(self, query, proj):
+        self.find_calls += 1
+        return FakeCursor(self)
+
+
+class FakeComplaints:
+    def __init__(self, doc):
+        self.doc = doc
+
+    async def update_one(self, query, update):
+        voted_by = self.doc["voted_by"]
+        uid = update.get("$push", update.get("$pull", {})).get("voted_by")
+        matched = query["id"] == self.doc["id"]
+        if isinstance(query["voted_by"], dict):
+            matched = matched and uid not in voted_by
+        else:
+            matched = matched and uid in voted_by
+        if matched:
+            if "$push" in update:
+                voted_by.append(uid)
+            else:
+                voted_by.remove(uid)
+            self.doc["votes"] += update["$inc"]["votes"]
+        return SimpleNamespace(matched_count=int(matched), modified_count=int(matched))
+
+
+class FakeDB(dict):
+    def __getattr__(self, name):
+        return self[name]
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(server, "db", db)
+    return db
+
+
+def test_find_shared_issues_one_find_for_concurrent_reads(fake_db):
+    notices = fake_db["notices"] = FakeCollection([{"id": "N1"}])
+
+    async def run():
+        reads = [asyncio.create_task(server.find_shared("notices", {}, {})) for _ in range(3)]
+        await asyncio.sleep(0)
+        notices.release.set()
+        return await asyncio.gather(*reads)
+
+    results = asyncio.run(run())
+
+    assert notices.find_calls == 1
+    assert results == [[{"id": "N1"}]] * 3
+    assert server.inflight_reads == {}
+
+
+def test_find_shared_raises_error_in_every_waiter(fake_db):
+    notices = fake_db["notices"] = FakeCollection(error=RuntimeError("boom"))
+
+    async def run():
+        reads = [asyncio.create_task(server.find_shared("notices", {}, {})) for _ in range(2)]
+        await asyncio.sleep(0)
+        notices.release.set()
+        return await asyncio.gather(*reads, return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert notices.find_calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert server.inflight_reads == {}
+
+
+def test_find_shared_survives_first_caller_cancellation(fake_db):
+    notices = fake_db["notices"] = FakeCollection([{"id": "N1"}])
+
+    async def run():
+        first = asyncio.create_task(server.find_shared("notices", {}, {}))
+        second = asyncio.create_task(server.find_shared("notices", {}, {}))
+        await asyncio.sleep(0)
+        first.cancel()
+        notices.release.set()
+        return first, await second
+
+    first, result = asyncio.run(run())
+
+    assert first.cancelled()
+    assert result == [{"id": "N1"}]
+
+
+def test_vote_complaint_toggles_vote(fake_db):
+    complaint = {"id": "C1", "votes": 0, "voted_by": []}
+    fake_db["complaints"] = FakeComplaints(complaint)
+
+    added = asyncio.run(server.vote_complaint("C1", {"user_id": "S123"}))
+    assert added["action"] == "added"
+    assert complaint == {"id": "C1", "votes": 1, "voted_by": ["S123"]}
+
+    removed = asyncio.run(server.vote_complaint("C1", {"user_id": "S123"}))
+    assert removed["action"] == "removed"
+    assert complaint == {"id": "C1", "votes": 0, "voted_by": []}
+
+
+def test_vote_complaint_missing_complaint(fake_db):
+    fake_db["complaints"] = FakeComplaints({"id": "C1", "votes": 0, "voted_by": []})
+
+    with pytest.raises(server.HTTPException) as exc_info:
+        asyncio.run(server.vote_complaint("C9", {"user_id": "S123"}))
+
+    assert exc_info.value.status_code == 404
+
+
+def test_cached_listing_bounds_pages_per_collection(fake_db, monkeypatch):
+    library = fake_db["library"] = FakeCollection([{"id": "L1"}])
+    library.release.set()
+    monkeypatch.setattr(server, "listing_cache", server.TTLCache(maxsize=4, ttl=30))
+
+    async def run():
+        for n in range(10):
+            page = server.Page(limit=server.MAX_PAGE_SIZE, after=f"L{n}")
+            await server.cached_listing("library", server.LIBRARY_PROJ, page)
+
+    asyncio.run(run())
+
+    assert library.find_calls == 10
+    assert len(server.listing_cache) == 4
+
+
+def test_migrate_string_dates_converts_only_strings(fake_db):
+    calls = []
+
+    class FakeDates:
+        async def update_many(self, query, update):
+            calls.append((query, update))
+            return SimpleNamespace(modified_count=0)
+
+    fake_db["complaints"] = fake_db["materials"] = FakeDates()
+
+    asyncio.run(server.migrate_string_dates())
+
+    assert [query for query, _ in calls] == [
+        {"submitted_date": {"$type": "string"}},
+        {"resolved_date": {"$type": "string"}},
+        {"uploaded_date": {"$type": "string"}},
+    ]
+    conversion = calls[0][1][0]["$set"]["submitted_date"]["$dateFromString"]
+    assert conversion["dateString"] == "$submitted_date"
+    assert conversion["onError"] == "$submitted_date"